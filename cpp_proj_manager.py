@@ -1,9 +1,18 @@
 import os
+import argparse
+import json
+import shutil
+import string
 import subprocess
 import platform
 import re
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-def detect_os():
+_COMPILER_PATH_RE = re.compile(r'"compilerPath":\s*"[^"]*"')
+_DEBUGGER_PATH_RE = re.compile(r'"miDebuggerPath":\s*"[^"]*"')
+
+def _detect_os_once():
     """Detect the current operating system."""
     if os.name == "nt":
         return "Windows"
@@ -15,19 +24,53 @@ def detect_os():
     else:
         return "Unknown"
 
+_OS_TYPE = _detect_os_once()
+
+def detect_os():
+    """Return the operating system detected at import time."""
+    return _OS_TYPE
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
 def extract_version(output):
-    """Extract version information from the tool's version output using regex."""
-    version_pattern = r"\b(\d+\.\d+\.\d+|\d+\.\d+|\d+)\b"
-    match = re.search(version_pattern, output)
-    if match:
-        return match.group(0)
-    else:
-        return None
+    """Extract the first standalone MAJOR[.MINOR[.PATCH]] number from the tool's version output."""
+    length = len(output)
+    i = 0
+    while i < length:
+        if not output[i].isdecimal() or (i > 0 and _is_word_char(output[i - 1])):
+            i += 1
+            continue
+        # Consume the leading digit run plus up to two ".digits" parts,
+        # remembering where each candidate version ends
+        j = i
+        while j < length and output[j].isdecimal():
+            j += 1
+        ends = [j]
+        for _ in range(2):
+            if j + 1 < length and output[j] == "." and output[j + 1].isdecimal():
+                j += 1
+                while j < length and output[j].isdecimal():
+                    j += 1
+                ends.append(j)
+            else:
+                break
+        # Prefer the longest candidate that ends on a word boundary
+        for end in reversed(ends):
+            if end == length or not _is_word_char(output[end]):
+                return output[i:end]
+        i = ends[0]
+    return None
 
 def check_tool(tool_name, check_command):
     try:
-        result = subprocess.run(check_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        version_output = result.stdout or result.stderr
+        try:
+            result = subprocess.run(check_command, capture_output=True, timeout=5)
+            # The version is always near the start, so only decode the head
+            version_output = (result.stdout or result.stderr)[:256].decode("ascii", "replace")
+        except subprocess.TimeoutExpired:
+            # The tool exists but hung while reporting its version
+            version_output = ""
         version = extract_version(version_output)
         return {
             "name": tool_name,
@@ -43,38 +86,37 @@ def check_tool(tool_name, check_command):
             "message": f"{tool_name} is not installed."
         }
 
+@lru_cache(maxsize=None)
 def find_tool_path(tool_name):
-    os_type = detect_os()
-    try:
-        if os_type == "Windows":
-            result = subprocess.run(["where", tool_name], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        elif os_type in ["Linux", "macOS"]:
-            result = subprocess.run(["which", tool_name], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        else:
-            return None
-        tool_path = result.stdout.strip()
-        return tool_path if tool_path else None
-    except subprocess.CalledProcessError as e:
-        print(f"Error finding {tool_name}: {e}")
-        return None
-
-def check_all_tools():
-    os_type = detect_os()
-    tools_to_check = []
-    if os_type == "Windows":
-        tools_to_check = [
-            {"name": "CMake", "check_command": ["cmake", "--version"]},
-            {"name": "MSVC", "check_command": ["cl"]},
-            {"name": "GDB", "check_command": ["gdb", "--version"]},
-        ]
-    elif os_type == "macOS" or os_type == "Linux":
-        tools_to_check = [
-            {"name": "CMake", "check_command": ["cmake", "--version"]},
-            {"name": "GCC", "check_command": ["gcc", "--version"]},
-            {"name": "G++", "check_command": ["g++", "--version"]},
-            {"name": "GDB", "check_command": ["gdb", "--version"]},
-        ]
-    else:
+    """Locate a tool on PATH (honours PATHEXT on Windows)."""
+    return shutil.which(tool_name)
+
+_POSIX_TOOLS = [
+    {"name": "CMake", "check_command": ["cmake", "--version"]},
+    {"name": "GCC", "check_command": ["gcc", "--version"]},
+    {"name": "G++", "check_command": ["g++", "--version"]},
+    {"name": "GDB", "check_command": ["gdb", "--version"]},
+]
+
+# Tools to probe for each supported operating system
+_TOOLS_BY_OS = {
+    "Windows": [
+        {"name": "CMake", "check_command": ["cmake", "--version"]},
+        {"name": "MSVC", "check_command": ["cl"]},
+        {"name": "GDB", "check_command": ["gdb", "--version"]},
+    ],
+    "Linux": _POSIX_TOOLS,
+    "macOS": _POSIX_TOOLS,
+}
+
+def check_all_tools(fast=False):
+    """Probe the build tools for the current OS.
+
+    With fast=True, CMake is probed on its own first and the remaining probes
+    are skipped when it is missing, since no project can be generated without it.
+    """
+    tools_to_check = _TOOLS_BY_OS.get(detect_os())
+    if tools_to_check is None:
         print("Unknown operating system detected.")
         return
 
@@ -83,8 +125,25 @@ def check_all_tools():
     cmake_found = False
     missing_tools = []
 
-    for tool in tools_to_check:
-        result = check_tool(tool["name"], tool["check_command"])
+    probed_tools = []
+    results = []
+    remaining_tools = tools_to_check
+    if fast:
+        cmake_tool = {"name": "CMake", "check_command": ["cmake", "--version"]}
+        cmake_result = check_tool(cmake_tool["name"], cmake_tool["check_command"])
+        if not cmake_result["found"]:
+            print(cmake_result["message"])
+            return False, False, False, [cmake_tool["name"]]
+        probed_tools.append(cmake_tool)
+        results.append(cmake_result)
+        remaining_tools = [tool for tool in tools_to_check if tool["name"] != "CMake"]
+
+    # Probes are dominated by process startup, so run them concurrently
+    probed_tools.extend(remaining_tools)
+    with ThreadPoolExecutor(max_workers=len(remaining_tools)) as executor:
+        results.extend(executor.map(lambda t: check_tool(t["name"], t["check_command"]), remaining_tools))
+
+    for tool, result in zip(probed_tools, results):
         print(result["message"])
         if tool["name"] in ["GCC", "G++", "MSVC"] and result["found"]:
             compilers_found = True
@@ -97,180 +156,235 @@ def check_all_tools():
 
     return compilers_found, debuggers_found, cmake_found, missing_tools
 
-def create_project_structure(project_name, os_type, compilers_found, debuggers_found, cmake_found):
-    """Create a basic C++ project structure."""
-    try:
-        os.makedirs(project_name, exist_ok=True)
-        os.makedirs(os.path.join(project_name, "src"), exist_ok=True)
-        os.makedirs(os.path.join(project_name, "include"), exist_ok=True)
-        os.makedirs(os.path.join(project_name, "build"), exist_ok=True)
-        os.makedirs(os.path.join(project_name, ".vscode"), exist_ok=True)
-
-        # Create a sample main.cpp file
-        main_cpp_path = os.path.join(project_name, "src", "main.cpp")
-        with open(main_cpp_path, "w") as main_cpp_file:
-            main_cpp_file.write("""
+# Sample source written into every new project
+_MAIN_CPP = b"""
 #include <iostream>
 
 int main() {
     std::cout << "Hello, World!" << std::endl;
     return 0;
 }
-""")
+"""
 
-        # Create a CMakeLists.txt file only if CMake is found
-        if cmake_found:
-            cmake_lists_path = os.path.join(project_name, "CMakeLists.txt")
-            with open(cmake_lists_path, "w") as cmake_file:
-                cmake_file.write(f"""
+# CMakeLists.txt contents; $$ escapes the literal ${SOURCES} CMake variable
+_CMAKE_TEMPLATE = string.Template("""
 cmake_minimum_required(VERSION 3.10)
-project({project_name})
+project($PROJECT)
 
 set(CMAKE_CXX_STANDARD 17)
 
 # Add source files
 file(GLOB_RECURSE SOURCES "src/*.cpp")
 
-add_executable({project_name} ${{SOURCES}})
+add_executable($PROJECT $${SOURCES})
 """)
 
+def write_files(pending_writes):
+    """Write a batch of (path, bytes) pairs with raw file descriptors."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    for path, data in pending_writes:
+        fd = os.open(path, flags, 0o666)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+def create_project_structure(project_name, os_type, compilers_found, debuggers_found, cmake_found):
+    """Create a basic C++ project structure."""
+    try:
+        # makedirs creates the project root (and rejects an empty name); the
+        # subdirectories then only need a single mkdir each
+        os.makedirs(project_name, exist_ok=True)
+        for sub_dir in (".vscode", "src", "include", "build"):
+            try:
+                os.mkdir(os.path.join(project_name, sub_dir))
+            except FileExistsError:
+                pass
+
+        # File contents are collected here and written in a single pass at the end
+        pending_writes = []
+
+        # Create a sample main.cpp file
+        main_cpp_path = os.path.join(project_name, "src", "main.cpp")
+        pending_writes.append((main_cpp_path, _MAIN_CPP))
+
+        # Create a CMakeLists.txt file only if CMake is found
+        if cmake_found:
+            cmake_lists_path = os.path.join(project_name, "CMakeLists.txt")
+            cmake_content = _CMAKE_TEMPLATE.substitute(PROJECT=project_name)
+            pending_writes.append((cmake_lists_path, cmake_content.encode("utf-8")))
+
         # Create VSCode configuration files
-        create_vscode_config_files(project_name, os_type, compilers_found, debuggers_found)
-        
+        create_vscode_config_files(project_name, os_type, compilers_found, debuggers_found, cmake_found, pending_writes)
+
+        write_files(pending_writes)
+
         print(f"Project '{project_name}' structure created successfully.")
     except Exception as e:
         print(f"Error creating project structure: {e}")
 
-def create_vscode_config_files(project_name, os_type, compilers_found, debuggers_found):
-    """Create VSCode configuration files for debugging, building, and IntelliSense."""
+# Compiler executable and IntelliSense mode used for each operating system
+_COMPILER_BY_OS = {
+    "Windows": ("cl", "windows-msvc-x64"),
+    "Linux": ("g++", "linux-gcc-x64"),
+    "macOS": ("g++", "macos-gcc-x64"),
+}
+
+def _compiler_for(os_type):
+    """Return the (compiler, intelliSenseMode) pair for the given OS, defaulting to Windows."""
+    return _COMPILER_BY_OS.get(os_type, _COMPILER_BY_OS["Windows"])
+
+def make_cpp_configuration(os_type):
+    """Build a c_cpp_properties.json configuration entry for the given OS."""
+    compiler, intellisense_mode = _compiler_for(os_type)
+    return {
+        "name": os_type,
+        "includePath": [
+            "${workspaceFolder}/include",
+            "${workspaceFolder}/src"
+        ],
+        "defines": [],
+        "compilerPath": find_tool_path(compiler) or "",
+        "cStandard": "c17",
+        "cppStandard": "c++17",
+        "intelliSenseMode": intellisense_mode
+    }
+
+def create_vscode_config_files(project_name, os_type, compilers_found, debuggers_found, cmake_found, pending_writes):
+    """Queue VSCode configuration files for debugging, building, and IntelliSense."""
     vscode_folder = os.path.join(project_name, ".vscode")
     
     # Create launch.json for debugging if debugger is found
     if debuggers_found:
         launch_json_path = os.path.join(vscode_folder, "launch.json")
         debugger_path = find_tool_path('gdb') if os_type in ["Linux", "macOS"] else ""
-        with open(launch_json_path, "w") as launch_file:
-            launch_file.write(f"""
-{{
-    "version": "0.2.0",
-    "configurations": [
-        {{
-            "name": "(gdb) Launch",
-            "type": "cppdbg",
-            "request": "launch",
-            "program": "${{workspaceFolder}}/build/{project_name}",
-            "args": [],
-            "stopAtEntry": false,
-            "cwd": "${{workspaceFolder}}",
-            "environment": [],
-            "externalConsole": false,
-            "MIMode": "gdb",
-            "setupCommands": [
-                {{
-                    "description": "Enable pretty-printing for gdb",
-                    "text": "-enable-pretty-printing",
-                    "ignoreFailures": true
-                }}
-            ],
-            "preLaunchTask": "build",
-            "miDebuggerPath": "{debugger_path}"
-        }}
-    ]
-}}
-""")
+        launch_config = {
+            "version": "0.2.0",
+            "configurations": [
+                {
+                    "name": "(gdb) Launch",
+                    "type": "cppdbg",
+                    "request": "launch",
+                    "program": f"${{workspaceFolder}}/build/{project_name}",
+                    "args": [],
+                    "stopAtEntry": False,
+                    "cwd": "${workspaceFolder}",
+                    "environment": [],
+                    "externalConsole": False,
+                    "MIMode": "gdb",
+                    "setupCommands": [
+                        {
+                            "description": "Enable pretty-printing for gdb",
+                            "text": "-enable-pretty-printing",
+                            "ignoreFailures": True
+                        }
+                    ],
+                    "preLaunchTask": "build",
+                    "miDebuggerPath": debugger_path or ""
+                }
+            ]
+        }
+        pending_writes.append((launch_json_path, json.dumps(launch_config, indent=4).encode("utf-8")))
 
     # Create tasks.json for building if CMake is found
     if compilers_found and cmake_found:
         tasks_json_path = os.path.join(vscode_folder, "tasks.json")
-        with open(tasks_json_path, "w") as tasks_file:
-            tasks_file.write(f"""
-{{
-    "version": "2.0.0",
-    "tasks": [
-        {{
-            "label": "build",
-            "type": "shell",
-            "command": "cmake --build build",
-            "group": {{
-                "kind": "build",
-                "isDefault": true
-            }},
-            "problemMatcher": ["$gcc"],
-            "detail": "Generated task for building the project."
-        }}
-    ]
-}}
-""")
+        tasks_config = {
+            "version": "2.0.0",
+            "tasks": [
+                {
+                    "label": "build",
+                    "type": "shell",
+                    "command": "cmake --build build",
+                    "group": {
+                        "kind": "build",
+                        "isDefault": True
+                    },
+                    "problemMatcher": ["$gcc"],
+                    "detail": "Generated task for building the project."
+                }
+            ]
+        }
+        pending_writes.append((tasks_json_path, json.dumps(tasks_config, indent=4).encode("utf-8")))
 
     # Create settings.json for configuring VSCode workspace settings
     settings_json_path = os.path.join(vscode_folder, "settings.json")
-    with open(settings_json_path, "w") as settings_file:
-        settings_file.write("""
-{
-    "cmake.sourceDirectory": "${workspaceFolder}",
-    "C_Cpp.intelliSenseEngine": "Default",
-    "C_Cpp.default.configurationProvider": "ms-vscode.cmake-tools"
-}
-""")
+    settings_config = {
+        "cmake.sourceDirectory": "${workspaceFolder}",
+        "C_Cpp.intelliSenseEngine": "Default",
+        "C_Cpp.default.configurationProvider": "ms-vscode.cmake-tools"
+    }
+    pending_writes.append((settings_json_path, json.dumps(settings_config, indent=4).encode("utf-8")))
 
     # Create c_cpp_properties.json for IntelliSense configurations if compiler is found
     if compilers_found:
         c_cpp_properties_path = os.path.join(vscode_folder, "c_cpp_properties.json")
-        compiler_path = find_tool_path('g++') if os_type in ["Linux", "macOS"] else find_tool_path('cl')
-        with open(c_cpp_properties_path, "w") as cpp_properties_file:
-            cpp_properties_file.write(f"""
-{{
-    "configurations": [
-        {{
-            "name": "{os_type}",
-            "includePath": [
-                "${{workspaceFolder}}/include",
-                "${{workspaceFolder}}/src"
-            ],
-            "defines": [],
-            "compilerPath": "{compiler_path}",
-            "cStandard": "c17",
-            "cppStandard": "c++17",
-            "intelliSenseMode": "{os_type.lower()}-gcc-x64" if os_type in ["Linux", "macOS"] else "windows-msvc-x64"
-        }}
-    ],
-    "version": 4
-}}
-""")
+        cpp_properties_config = {
+            "configurations": [make_cpp_configuration(os_type)],
+            "version": 4
+        }
+        pending_writes.append((c_cpp_properties_path, json.dumps(cpp_properties_config, indent=4).encode("utf-8")))
+
+def _update_tool_path(config_path, key, key_re, tool_path):
+    """Set `key` to `tool_path` on every configuration in a VSCode config file that already defines it."""
+    with open(config_path, "rb+") as config_file:
+        try:
+            text = config_file.read().decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            print(f"Error reading {config_path}: {e}")
+            return
+        try:
+            config = json.loads(text)
+        except json.JSONDecodeError:
+            # VSCode writes JSONC (comments, trailing commas), so patch the existing values in place
+            data = key_re.sub(lambda _: f'"{key}": {json.dumps(tool_path)}', text)
+        else:
+            if not isinstance(config, dict) or not isinstance(config.get("configurations", []), list):
+                print(f"Error reading {config_path}: expected an object with a list of configurations")
+                return
+            for configuration in config.get("configurations", []):
+                if not isinstance(configuration, dict):
+                    print(f"Skipping malformed configuration in {config_path}: {configuration!r}")
+                    continue
+                if key in configuration:
+                    configuration[key] = tool_path
+            data = json.dumps(config, indent=4)
+        config_file.seek(0)
+        config_file.write(data.encode("utf-8"))
+        config_file.truncate()
 
 def edit_project_configurations(project_path):
     """Edit existing project configurations to match the current device setup."""
     vscode_folder = os.path.join(project_path, ".vscode")
+    os_type = detect_os()
     
     # Update c_cpp_properties.json with the correct compiler path
     c_cpp_properties_path = os.path.join(vscode_folder, "c_cpp_properties.json")
     if os.path.exists(c_cpp_properties_path):
-        with open(c_cpp_properties_path, "r+") as cpp_properties_file:
-            config = cpp_properties_file.read()
-            compiler_path = find_tool_path('g++') if detect_os() in ["Linux", "macOS"] else find_tool_path('cl')
-            config = re.sub(r'"compilerPath":\s*".*?"', f'"compilerPath": "{compiler_path}"', config)
-            cpp_properties_file.seek(0)
-            cpp_properties_file.write(config)
-            cpp_properties_file.truncate()
+        compiler_path = find_tool_path(_compiler_for(os_type)[0])
+        _update_tool_path(c_cpp_properties_path, "compilerPath", _COMPILER_PATH_RE, compiler_path or "")
 
     # Update launch.json to match the current debugger path
     launch_json_path = os.path.join(vscode_folder, "launch.json")
     if os.path.exists(launch_json_path):
-        with open(launch_json_path, "r+") as launch_file:
-            config = launch_file.read()
-            debugger_path = find_tool_path('gdb') if detect_os() in ["Linux", "macOS"] else ""
-            config = re.sub(r'"miDebuggerPath":\s*".*?"', f'"miDebuggerPath": "{debugger_path}"', config)
-            launch_file.seek(0)
-            launch_file.write(config)
-            launch_file.truncate()
+        debugger_path = find_tool_path('gdb') if os_type in ["Linux", "macOS"] else ""
+        _update_tool_path(launch_json_path, "miDebuggerPath", _DEBUGGER_PATH_RE, debugger_path or "")
 
 def main():
+    parser = argparse.ArgumentParser(description="Create and configure C++ projects for VSCode.")
+    parser.add_argument("--fast", action="store_true", help="stop probing tools as soon as CMake is found missing")
+    args = parser.parse_args()
+
     # First functionality: Check OS, check tools, and give options to user
-    compilers_found, debuggers_found, cmake_found, missing_tools = check_all_tools()
+    compilers_found, debuggers_found, cmake_found, missing_tools = check_all_tools(fast=args.fast)
     os_type = detect_os()
 
     if compilers_found and debuggers_found and cmake_found:
         while True:
+            # Tools may have been installed or moved since the last action
+            find_tool_path.cache_clear()
             print("\nOptions:")
             print("1. Create a new project")
             print("2. Edit existing project configuration")